@@ -27,6 +27,7 @@ from pyproj import CRS as PJCRS
 from ruamel.yaml.comments import CommentedMap
 from shapely.geometry import Polygon, shape
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
 from werkzeug.datastructures import MultiDict
 
 import datacube.drivers.postgres._schema
@@ -701,7 +702,25 @@ def alchemy_engine(index: Index) -> Engine:
     # There's no public api for sharing the existing engine (it's an implementation detail of the current index).
     # We could create our own from config, but there's no api for getting the ODC config for the index either.
     # pylint: disable=protected-access
-    return index.datasets._db._engine
+    engine = index.datasets._db._engine
+    _check_engine_pool(engine)
+    return engine
+
+
+@functools.lru_cache()
+def _check_engine_pool(engine: Engine):
+    """
+    Warn (once per engine) if its connections aren't pooled.
+
+    We call alchemy_engine() for every product refresh and page load, and the
+    engine is configured by ODC, not us: without a pool, every one of our
+    (many, short) queries pays for a new database connection.
+    """
+    if isinstance(engine.pool, NullPool):
+        _LOG.warn(
+            "engine.unpooled_connections",
+            hint="Postgres connections will not be reused: every query will reconnect",
+        )
 
 
 def make_dataset_from_select_fields(index, row):
@@ -93,6 +93,8 @@ class GenerateSettings:
     recreate_dataset_extents: bool
     reset_incremental_position: bool
     minimum_change_scan_window: timedelta = None
+    compute_extents_in_python: bool = False
+    extent_workers: int = 1
 
 
 # pylint: disable=broad-except
@@ -125,6 +127,8 @@ def generate_report(
             recreate_dataset_extents=settings.recreate_dataset_extents,
             reset_incremental_position=settings.reset_incremental_position,
             minimum_change_scan_window=settings.minimum_change_scan_window,
+            compute_extents_in_python=settings.compute_extents_in_python,
+            extent_workers=settings.extent_workers,
         )
         return product_name, result, updated_summary
     except UnsupportedWKTProductCRS as e:
@@ -291,6 +295,20 @@ class TimeDeltaParam(click.ParamType):
     """
     ),
 )
+@click.option(
+    "--extent-jobs",
+    type=click.IntRange(1, 256),
+    default=1,
+    help=dedent(
+        """\
+        Number of concurrent DB connections each product uses when recreating
+        all of its dataset extents (1-256, default: 1)
+
+        These are per job, so up to (jobs × extent-jobs) extent queries can run
+        at once.
+    """
+    ),
+)
 @click.option(
     "-l",
     "--event-log-file",
@@ -369,6 +387,19 @@ class TimeDeltaParam(click.ParamType):
         """
     ),
 )
+@click.option(
+    "--compute-extents-in-python/--compute-extents-in-postgres",
+    is_flag=True,
+    default=False,
+    help=dedent(
+        """\
+        Compute new dataset extents in Python, rather than in Postgres. (default: false)
+
+        This moves the (json and geometry) processing load from the database server to
+        this machine, at the expense of fetching every new dataset document.
+        """
+    ),
+)
 @click.option(
     "--force-concurrently",
     is_flag=True,
@@ -409,6 +440,7 @@ def cli(
     config: LocalConfig,
     generate_all_products: bool,
     jobs: int,
+    extent_jobs: int,
     product_names: List[str],
     event_log_file: str,
     refresh_stats: bool,
@@ -420,6 +452,7 @@ def cli(
     recreate_dataset_extents: bool,
     reset_incremental_position: bool,
     minimum_scan_window: Optional[timedelta],
+    compute_extents_in_python: bool,
 ):
     init_logging(
         open(event_log_file, "a") if event_log_file else None, verbosity=verbose
@@ -462,6 +495,8 @@ def cli(
             recreate_dataset_extents,
             reset_incremental_position,
             minimum_change_scan_window=minimum_scan_window,
+            compute_extents_in_python=compute_extents_in_python,
+            extent_workers=extent_jobs,
         ),
         products,
         workers=jobs,
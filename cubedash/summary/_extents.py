@@ -1,19 +1,25 @@
 import functools
 import json
+import re
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, date
 from pathlib import Path
-from typing import Dict, Iterable, Optional, List
+from typing import Dict, Generator, Iterable, Optional, List, Tuple
 
 import fiona
+import psycopg2.extras
 import shapely.ops
+import shapely.wkb
 import structlog
 from geoalchemy2 import Geometry, WKBElement
 from geoalchemy2.shape import to_shape, from_shape
 from psycopg2._range import Range as PgRange
-from shapely.geometry import shape
+from shapely.geometry import Polygon, shape
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy import (
     BigInteger,
     Integer,
@@ -26,14 +32,22 @@ from sqlalchemy import (
     select,
     column,
     and_,
+    exists,
     String,
+    table,
 )
 from sqlalchemy.dialects import postgresql as postgres
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql.elements import ClauseElement, Label
 
 import datacube.drivers.postgres._api as postgres_api
-from cubedash._utils import alchemy_engine, infer_crs, ODC_DATASET as DATASET
+from cubedash._utils import (
+    alchemy_engine,
+    dataset_created,
+    infer_crs,
+    ODC_DATASET as DATASET,
+)
 from cubedash.summary._schema import DATASET_SPATIAL, SPATIAL_REF_SYS
 from datacube import Datacube
 from datacube.drivers.postgres._fields import PgDocField, RangeDocField
@@ -47,6 +61,15 @@ _WRS_PATH_ROW = [
     Path(__file__).parent.parent / "data" / "WRS2_ascending" / "WRS2_acsending.shp",
 ]
 
+# A session-local (temporary) table used while bulk-loading dataset extents.
+_STAGING_TABLE = "dataset_spatial_stage"
+# How many datasets to compute per staging batch.
+# (Postgres gains little from larger batches, and it keeps each statement short-lived)
+_STAGING_BATCH_SIZE = 10_000
+# How many rows to send per statement when inserting python-computed extents.
+# (And how many datasets to load from ODC at a time to compute them.)
+_BULK_INSERT_PAGE_SIZE = 2000
+
 
 class UnsupportedWKTProductCRS(NotImplementedError):
     """We can't, within Postgis, support arbitrary WKT CRSes at the moment."""
@@ -55,6 +78,14 @@ class UnsupportedWKTProductCRS(NotImplementedError):
         self.reason = reason
 
 
+# The expression builders below are cached per MetadataType, as the expression trees
+# are large and were rebuilt for every query.
+#
+# (MetadataTypes are hashed by identity, and ODC gives us a new instance whenever one
+#  is updated, so a cached expression can't outlive its definition.)
+
+
+@functools.lru_cache()
 def get_dataset_extent_alchemy_expression(md: MetadataType, default_crs: str = None):
     """
     Build an SQLAlchemy expression to get the extent for a dataset.
@@ -63,12 +94,10 @@ def get_dataset_extent_alchemy_expression(md: MetadataType, default_crs: str = N
 
     The logic here mirrors the extent() function of datacube.model.Dataset.
     """
-    doc = _jsonb_doc_expression(md)
-
-    if "grid_spatial" not in md.definition["dataset"]:
-        # Non-spatial product
+    if not _is_spatial(md):
         return None
 
+    doc = _jsonb_doc_expression(md)
     projection_offset = _projection_doc_offset(md)
 
     if expects_eo3_metadata_type(md):
@@ -105,6 +134,11 @@ def get_dataset_extent_alchemy_expression(md: MetadataType, default_crs: str = N
         )
 
 
+def _is_spatial(md: MetadataType) -> bool:
+    """Do datasets of this metadata type have spatial information?"""
+    return "grid_spatial" in md.definition["dataset"]
+
+
 def expects_eo3_metadata_type(md: MetadataType) -> bool:
     """
     Does the given metadata type expect EO3 datasets?
@@ -151,13 +185,12 @@ def _size_bytes_field(dt: DatasetType):
     return _jsonb_doc_expression(dt.metadata_type)["size_bytes"].astext.cast(BigInteger)
 
 
+@functools.lru_cache()
 def get_dataset_srid_alchemy_expression(md: MetadataType, default_crs: str = None):
-    doc = md.dataset_fields["metadata_doc"].alchemy_expression
-
-    if "grid_spatial" not in md.definition["dataset"]:
-        # Non-spatial product
+    if not _is_spatial(md):
         return None
 
+    doc = md.dataset_fields["metadata_doc"].alchemy_expression
     projection_offset = md.definition["dataset"]["grid_spatial"]
 
     if expects_eo3_metadata_type(md):
@@ -169,75 +202,24 @@ def get_dataset_srid_alchemy_expression(md: MetadataType, default_crs: str = Non
     # When datasets have no CRS, optionally use this as default.
     default_crs_expression = None
     if default_crs:
-        if not default_crs.lower().startswith(
-            "epsg:"
-        ) and not default_crs.lower().startswith("esri:"):
-            # HACK: Change default CRS with inference
-            inferred_crs = infer_crs(default_crs)
-            if inferred_crs is None:
-                raise UnsupportedWKTProductCRS(
-                    f"WKT Product CRSes are not currently well supported, and "
-                    f"we can't infer this product's one. "
-                    f"(Ideally use an auth-name format for CRS, such as 'EPSG:1234') "
-                    f"Got: {default_crs!r}"
-                )
-            default_crs = inferred_crs
-
-        auth_name, auth_srid = default_crs.split(":")
+        auth_name, auth_srid = _product_crs_authority(default_crs)
         default_crs_expression = (
             select([SPATIAL_REF_SYS.c.srid])
-            .where(func.lower(SPATIAL_REF_SYS.c.auth_name) == auth_name.lower())
-            .where(SPATIAL_REF_SYS.c.auth_srid == int(auth_srid))
+            .where(func.lower(SPATIAL_REF_SYS.c.auth_name) == auth_name)
+            .where(SPATIAL_REF_SYS.c.auth_srid == auth_srid)
             .as_scalar()
         )
 
-    expression = func.coalesce(
-        case(
-            [
-                (
-                    # If matches shorthand code: eg. "epsg:1234"
-                    spatial_ref.op("~")(r"^[A-Za-z0-9]+:[0-9]+$"),
-                    select([SPATIAL_REF_SYS.c.srid])
-                    .where(
-                        func.lower(SPATIAL_REF_SYS.c.auth_name)
-                        == func.lower(func.split_part(spatial_ref, ":", 1))
-                    )
-                    .where(
-                        SPATIAL_REF_SYS.c.auth_srid
-                        == func.split_part(spatial_ref, ":", 2).cast(Integer)
-                    )
-                    .as_scalar(),
-                )
-            ],
-            else_=None,
-        ),
-        case(
-            [
-                (
-                    # Plain WKT that ends in an authority code.
-                    # Extract the authority name and code using regexp. Yuck!
-                    # Eg: ".... AUTHORITY["EPSG","32756"]]"
-                    spatial_ref.op("~")(r'AUTHORITY\["[a-zA-Z0-9]+", *"[0-9]+"\]\]$'),
-                    select([SPATIAL_REF_SYS.c.srid])
-                    .where(
-                        func.lower(SPATIAL_REF_SYS.c.auth_name)
-                        == func.lower(
-                            func.substring(
-                                spatial_ref,
-                                r'AUTHORITY\["([a-zA-Z0-9]+)", *"[0-9]+"\]\]$',
-                            )
-                        )
-                    )
-                    .where(
-                        SPATIAL_REF_SYS.c.auth_srid
-                        == func.substring(
-                            spatial_ref, r'AUTHORITY\["[a-zA-Z0-9]+", *"([0-9]+)"\]\]$'
-                        ).cast(Integer)
-                    )
-                    .as_scalar(),
-                )
-            ],
-            else_=None,
+    # The [authority name, code] of whichever form of crs the dataset has.
+    # Each form is matched and parsed with a single regexp, and they're tried in order.
+    authority = func.coalesce(
+        # If matches shorthand code: eg. "epsg:1234"
+        func.regexp_match(spatial_ref, r"^([A-Za-z0-9]+):([0-9]+)$"),
+        # Plain WKT that ends in an authority code.
+        # Extract the authority name and code using regexp. Yuck!
+        # Eg: ".... AUTHORITY["EPSG","32756"]]"
+        func.regexp_match(
+            spatial_ref, r'AUTHORITY\["([a-zA-Z0-9]+)", *"([0-9]+)"\]\]$'
         ),
         # Some older datasets have datum/zone fields instead.
         # The only remaining ones in DEA are 'GDA94'.
@@ -245,22 +227,44 @@ def get_dataset_srid_alchemy_expression(md: MetadataType, default_crs: str = Non
             [
                 (
                     doc[(projection_offset + ["datum"])].astext == "GDA94",
-                    select([SPATIAL_REF_SYS.c.srid])
-                    .where(func.lower(SPATIAL_REF_SYS.c.auth_name) == "epsg")
-                    .where(
-                        SPATIAL_REF_SYS.c.auth_srid
-                        == (
-                            "283"
-                            + func.abs(
-                                doc[(projection_offset + ["zone"])].astext.cast(Integer)
+                    postgres.array(
+                        [
+                            literal("epsg"),
+                            (
+                                "283"
+                                + func.abs(
+                                    doc[(projection_offset + ["zone"])].astext.cast(
+                                        Integer
+                                    )
+                                )
                             )
-                        ).cast(Integer)
-                    )
-                    .as_scalar(),
+                            .cast(Integer)
+                            .cast(String),
+                        ]
+                    ),
                 )
             ],
             else_=None,
         ),
+        type_=postgres.ARRAY(String),
+    )
+    # Postgres would inline a plain subquery, evaluating the above once for each
+    # reference to it. An offset stops it from doing so.
+    parsed = (
+        select([authority.label("authority")])
+        .correlate(DATASET)
+        .offset(0)
+        .alias("crs_authority")
+    )
+
+    expression = func.coalesce(
+        select([SPATIAL_REF_SYS.c.srid])
+        .select_from(parsed)
+        .where(
+            func.lower(SPATIAL_REF_SYS.c.auth_name) == func.lower(parsed.c.authority[1])
+        )
+        .where(SPATIAL_REF_SYS.c.auth_srid == parsed.c.authority[2].cast(Integer))
+        .as_scalar(),
         default_crs_expression,
         # TODO: Handle arbitrary WKT strings (?)
         # 'GEOGCS[\\"GEOCENTRIC DATUM of AUSTRALIA\\",DATUM[\\"GDA94\\",SPHEROID[
@@ -271,6 +275,31 @@ def get_dataset_srid_alchemy_expression(md: MetadataType, default_crs: str = Non
     return expression
 
 
+def _product_crs_authority(default_crs: str) -> Tuple[str, int]:
+    """
+    Get the (lowercase) authority name and code of a product's default crs.
+
+    >>> _product_crs_authority('EPSG:3577')
+    ('epsg', 3577)
+    """
+    if not default_crs.lower().startswith(
+        "epsg:"
+    ) and not default_crs.lower().startswith("esri:"):
+        # HACK: Change default CRS with inference
+        inferred_crs = infer_crs(default_crs)
+        if inferred_crs is None:
+            raise UnsupportedWKTProductCRS(
+                f"WKT Product CRSes are not currently well supported, and "
+                f"we can't infer this product's one. "
+                f"(Ideally use an auth-name format for CRS, such as 'EPSG:1234') "
+                f"Got: {default_crs!r}"
+            )
+        default_crs = inferred_crs
+
+    auth_name, auth_srid = default_crs.split(":")
+    return auth_name.lower(), int(auth_srid)
+
+
 def _gis_point(doc, doc_offset):
     return func.ST_MakePoint(
         doc[doc_offset + ["x"]].astext.cast(postgres.DOUBLE_PRECISION),
@@ -283,6 +312,8 @@ def refresh_spatial_extents(
     product: DatasetType,
     clean_up_deleted=False,
     assume_after_date: datetime = None,
+    compute_in_python: bool = False,
+    workers: int = 1,
 ):
     """
     Update the spatial extents to match any changes upstream in ODC.
@@ -290,6 +321,12 @@ def refresh_spatial_extents(
     :param assume_after_date: Only scan datasets that have changed after the given (db server) time.
                               If None, all datasets will be regenerated.
     :param clean_up_deleted: Scan for any manually deleted rows too. Slow.
+    :param compute_in_python: Compute new extents in Python and send them to the database,
+                              rather than computing them in Postgres. This moves the load
+                              from the database server to this machine.
+    :param workers: When regenerating all datasets in Postgres, split the work into this many
+                    shards, each computed in parallel on its own connection. (Limited to
+                    256, and to the connections available in the engine's pool.)
     """
     engine: Engine = alchemy_engine(index)
 
@@ -380,24 +417,35 @@ def refresh_spatial_extents(
         product_name=product.name,
         after_date=assume_after_date,
     )
-    changed += engine.execute(
-        (
-            postgres.insert(DATASET_SPATIAL)
-            .from_select(
-                column_values.keys(),
-                select(column_values.values())
-                .where(and_(*only_where))
-                .order_by(column_values["center_time"]),
+    if assume_after_date is None:
+        # We're (re)creating every dataset, so load them in bulk via a staging table.
+        if compute_in_python:
+            changed += populate_dataset_extents_from_python(index, product, only_where)
+        else:
+            changed += _populate_missing_dataset_extents_staged(
+                engine, column_values, only_where, workers=workers
             )
-            .on_conflict_do_nothing(index_elements=["id"])
-        )
-    ).rowcount
+    elif compute_in_python:
+        changed += _insert_new_extents_from_python(index, product, only_where)
+    else:
+        changed += engine.execute(
+            (
+                postgres.insert(DATASET_SPATIAL)
+                .from_select(
+                    column_values.keys(),
+                    select(column_values.values())
+                    .where(and_(*only_where))
+                    .order_by(column_values["center_time"]),
+                )
+                .on_conflict_do_nothing(index_elements=["id"])
+            )
+        ).rowcount
     log.info("spatial_insert.end", product_name=product.name, change_count=changed)
 
     # If we changed data...
     if changed:
         # And it's a non-spatial product...
-        if get_dataset_extent_alchemy_expression(product.metadata_type) is None:
+        if not _is_spatial(product.metadata_type):
             # And it has WRS path/rows...
             if "sat_path" in product.metadata_type.dataset_fields:
 
@@ -445,6 +493,567 @@ def refresh_spatial_extents(
     return changed
 
 
+def _insert_new_extents_from_python(
+    index: Index, product: DatasetType, only_where: List[ClauseElement]
+) -> int:
+    """
+    Insert extents for any of the product's matching datasets that are missing from
+    the spatial table, computing them in Python.
+
+    Returns the count of rows inserted.
+    """
+    engine: Engine = alchemy_engine(index)
+    srids = _load_srid_lookup(engine)
+    return _bulk_insert_extents(
+        engine,
+        iter_dataset_extent_rows(
+            index,
+            product,
+            srids,
+            datasets=_iter_datasets(
+                index, [*only_where, _missing_from_spatial_table()]
+            ),
+        ),
+    )
+
+
+def _missing_from_spatial_table() -> ClauseElement:
+    """
+    Is the (ODC) dataset missing from our spatial table?
+
+    (Inserts would skip existing rows anyway, but this avoids computing them at all)
+    """
+    return ~exists(
+        select([DATASET_SPATIAL.c.id]).where(DATASET_SPATIAL.c.id == DATASET.c.id)
+    )
+
+
+def _iter_datasets(
+    index: Index, where: List[ClauseElement]
+) -> Generator[Dataset, None, None]:
+    """
+    Load the matching ODC datasets, a page at a time.
+
+    (ODC's own search fetches every matching document before returning any, so we
+    stream the ids from a server-side cursor and fetch each page of datasets by id.)
+    """
+    with _streaming_connection(alchemy_engine(index)) as conn:
+        dataset_ids = conn.execute(select([DATASET.c.id]).where(and_(*where)))
+        while True:
+            ids = [id_ for [id_] in dataset_ids.fetchmany(_BULK_INSERT_PAGE_SIZE)]
+            if not ids:
+                break
+            yield from index.datasets.bulk_get(ids)
+
+
+def _populate_missing_dataset_extents_staged(
+    engine: Engine,
+    column_values: Dict[str, ClauseElement],
+    only_where: List[ClauseElement],
+    batch_size: int = _STAGING_BATCH_SIZE,
+    workers: int = 1,
+) -> int:
+    """
+    Insert any missing dataset extents, computing them via a temporary staging table.
+
+    The (expensive) extent expressions are evaluated into the staging table in
+    batches, paging through the datasets by id. The results are then merged into
+    the spatial table with a single insert, so its indexes aren't being maintained
+    while every footprint is being computed.
+
+    Postgres won't parallelise the insert itself, so with multiple workers the datasets
+    are split into shards by id, and each shard is staged and merged concurrently
+    by its own connection. Each shard holds its connection throughout, so workers
+    are limited to the connections that the engine's pool can give out.
+
+    Returns the count of rows inserted.
+    """
+    if workers > _MAX_SHARDS:
+        _LOG.warning(
+            "spatial_insert.limiting_workers", requested=workers, max_shards=_MAX_SHARDS
+        )
+        workers = _MAX_SHARDS
+
+    available_connections = _available_pool_connections(engine)
+    if available_connections is not None and workers > available_connections:
+        _LOG.warning(
+            "spatial_insert.limiting_workers",
+            requested=workers,
+            available_connections=available_connections,
+        )
+        workers = available_connections
+
+    if workers <= 1:
+        inserted = _stage_and_merge_extents(
+            engine, column_values, only_where, batch_size
+        )
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            inserted = sum(
+                executor.map(
+                    lambda shard: _stage_and_merge_extents(
+                        engine,
+                        column_values,
+                        [*only_where, _dataset_shard_expression(workers) == shard],
+                        batch_size,
+                    ),
+                    range(workers),
+                )
+            )
+
+    # The table's contents may have changed drastically: update the planner's statistics.
+    if inserted:
+        engine.execute(f"analyze {DATASET_SPATIAL.fullname}")
+    return inserted
+
+
+def _available_pool_connections(engine: Engine) -> Optional[int]:
+    """
+    How many more connections can the engine's pool give out, without waiting
+    for others to be returned? (None if it's not limited)
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    # (There's no public getter for the overflow limit. Negative means unlimited.)
+    max_overflow = getattr(pool, "_max_overflow", -1)
+    if max_overflow < 0:
+        return None
+    return max(pool.size() + max_overflow - pool.checkedout(), 1)
+
+
+# Datasets are sharded on one byte of their id.
+_MAX_SHARDS = 256
+
+
+def _dataset_shard_expression(n_shards: int) -> ClauseElement:
+    """
+    Which of the n shards each dataset belongs to, based on its id.
+
+    (The last byte of a (random) uuid is evenly distributed, so shards are similarly
+    sized. This limits us to 256 shards, which is plenty.)
+    """
+    if not 0 < n_shards <= _MAX_SHARDS:
+        raise ValueError(
+            f"Unsupported shard count {n_shards}: expected 1-{_MAX_SHARDS}"
+        )
+    return func.get_byte(func.uuid_send(DATASET.c.id), 15, type_=Integer) % n_shards
+
+
+def _stage_and_merge_extents(
+    engine: Engine,
+    column_values: Dict[str, ClauseElement],
+    only_where: List[ClauseElement],
+    batch_size: int,
+) -> int:
+    names = list(column_values.keys())
+    # Datasets already in the spatial table (such as those the preceding update just
+    # rewrote) would be discarded by the merge, so don't compute them at all.
+    is_missing = _missing_from_spatial_table()
+    with _extent_staging_table(engine) as (conn, stage):
+        last_id = None
+        while True:
+            batch = (
+                select(list(column_values.values()))
+                .where(and_(*only_where))
+                .where(is_missing)
+            )
+            if last_id is not None:
+                batch = batch.where(DATASET.c.id > last_id)
+            # Note that ODC's engine autocommits, so each batch is its own transaction.
+            staged_ids = [
+                id_
+                for [id_] in conn.execute(
+                    stage.insert()
+                    .from_select(names, batch.order_by(DATASET.c.id).limit(batch_size))
+                    .returning(stage.c.id)
+                )
+            ]
+            _LOG.debug("spatial_insert.staged", count=len(staged_ids))
+            if len(staged_ids) < batch_size:
+                break
+            last_id = max(staged_ids)
+
+        return _merge_staged_extents(conn, stage)
+
+
+def populate_dataset_extents_from_python(
+    index: Index, product: DatasetType, only_where: List[ClauseElement]
+) -> int:
+    """
+    Insert any missing dataset extents, computing them in Python rather than in Postgres.
+
+    Each dataset's footprint is calculated by ODC's own ``Dataset.extent`` logic,
+    and the rows are streamed to the staging table with a single ``COPY``. This
+    avoids Postgres parsing json and geometry for every row, at the expense
+    of transferring every dataset document to this machine.
+
+    Returns the count of rows inserted.
+    """
+    engine: Engine = alchemy_engine(index)
+    srids = _load_srid_lookup(engine)
+    rows = iter_dataset_extent_rows(
+        index,
+        product,
+        srids,
+        datasets=_iter_datasets(index, [*only_where, _missing_from_spatial_table()]),
+    )
+
+    with _extent_staging_table(engine) as (conn, stage):
+        # Copy is only available on the raw psycopg2 connection.
+        raw_connection = conn.connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"copy {_STAGING_TABLE} ({', '.join(_EXTENT_ROW_COLUMNS)}) from stdin",
+                _CopyRowsFile(rows),
+            )
+        inserted = _merge_staged_extents(conn, stage)
+
+    # Update the planner's statistics for the new rows.
+    if inserted:
+        engine.execute(f"analyze {DATASET_SPATIAL.fullname}")
+    return inserted
+
+
+def _bulk_insert_extents(
+    engine: Engine, rows: Iterable[Tuple], page_size: int = _BULK_INSERT_PAGE_SIZE
+) -> int:
+    """
+    Insert the given python-computed rows (from iter_dataset_extent_rows()) into the
+    spatial table, skipping any that already exist.
+
+    Rows are sent many-per-statement, which is far fewer round-trips than an
+    executemany() of single-row inserts. (For large loads, the staged COPY in
+    populate_dataset_extents_from_python() is faster still.)
+
+    Returns the count of rows inserted.
+    """
+    # Ids are sent as text, as psycopg2 doesn't adapt UUIDs by default.
+    # Footprints are hex EWKB, which Postgis parses as geometry input.
+    template = "(%s::uuid, %s, %s, %s::geometry, %s, %s, %s)"
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            inserted = psycopg2.extras.execute_values(
+                cursor,
+                f"insert into {DATASET_SPATIAL.fullname} "
+                f"({', '.join(_EXTENT_ROW_COLUMNS)}) values %s "
+                f"on conflict (id) do nothing returning id",
+                ((str(id_), *values) for id_, *values in rows),
+                template=template,
+                page_size=page_size,
+                # Rowcount only covers the last page, so count the returned ids instead.
+                fetch=True,
+            )
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+    return len(inserted)
+
+
+# The columns (in order) produced by iter_dataset_extent_rows()
+_EXTENT_ROW_COLUMNS = (
+    "id",
+    "dataset_type_ref",
+    "center_time",
+    "footprint",
+    "region_code",
+    "size_bytes",
+    "creation_time",
+)
+
+
+def iter_dataset_extent_rows(
+    index: Index,
+    product: DatasetType,
+    srids: Dict[Tuple[str, int], int],
+    datasets: Iterable[Dataset] = None,
+) -> Generator[Tuple, None, None]:
+    """
+    Calculate the spatial table row for each active dataset in the product.
+
+    This is the pure-python equivalent of _select_dataset_extent_columns(). Footprints
+    are given as hex EWKB strings, which Postgis accepts directly as geometry input.
+
+    :param srids: A lookup of (lowercase auth name, auth code) to postgis srid.
+    :param datasets: The product's datasets to calculate. Defaults to all of them.
+    """
+    region_info = RegionInfo.for_product(product, None)
+    md = product.metadata_type
+    # As in Postgres, non-spatial products have no footprints at all.
+    is_spatial = _is_spatial(md)
+
+    default_srid = None
+    default_crs = _default_crs(product)
+    if is_spatial and default_crs:
+        default_srid = srids.get(_product_crs_authority(default_crs))
+
+    simplify_tolerance = None
+    if product.grid_spec and product.grid_spec.resolution:
+        simplify_tolerance = min(abs(r) for r in product.grid_spec.resolution) / 4
+
+    if datasets is None:
+        datasets = _iter_datasets(
+            index,
+            [DATASET.c.dataset_type_ref == product.id, DATASET.c.archived.is_(None)],
+        )
+
+    for dataset in datasets:
+        yield (
+            dataset.id,
+            product.id,
+            dataset.center_time,
+            _dataset_footprint(
+                dataset.metadata_doc, md, srids, default_srid, simplify_tolerance
+            )
+            if is_spatial
+            else None,
+            region_info.dataset_region_code(dataset) if region_info else None,
+            _dataset_size_bytes(dataset),
+            dataset_created(dataset) or dataset.indexed_time,
+        )
+
+
+def _dataset_footprint(
+    doc: Dict,
+    md: MetadataType,
+    srids: Dict[Tuple[str, int], int],
+    default_srid: Optional[int],
+    simplify_tolerance: Optional[float],
+) -> Optional[str]:
+    """
+    The dataset's footprint as hex EWKB. Matches get_dataset_extent_alchemy_expression()
+
+    (We read the document directly, rather than use ODC's dataset.extent, as ODC
+    infers crses that Postgres doesn't, which would give us different srids.)
+    """
+    projection = _doc_offset(doc, _projection_doc_offset(md))
+    is_eo3 = expects_eo3_metadata_type(md)
+
+    if is_eo3 and doc.get("geometry") is not None:
+        geom = shape(doc["geometry"])
+    elif not is_eo3 and projection.get("valid_data") is not None:
+        geom = shape(projection["valid_data"])
+    else:
+        geom = _bounds_shape(projection.get("geo_ref_points"))
+    if geom is None:
+        return None
+
+    authority = _dataset_crs_authority(
+        doc.get("crs") if is_eo3 else projection.get("spatial_reference"), projection
+    )
+    srid = None if authority is None else srids.get(authority)
+    if srid is None:
+        srid = default_srid
+    # Postgres's ST_SetSRID() gives null without a srid, so we do too.
+    if srid is None:
+        return None
+
+    if simplify_tolerance is not None:
+        geom = geom.simplify(simplify_tolerance, preserve_topology=True)
+    return shapely.wkb.dumps(geom, hex=True, srid=srid)
+
+
+def _doc_offset(doc: Dict, offset: List[str]) -> Dict:
+    """
+    >>> _doc_offset({'a': {'b': {'c': 1}}}, ['a', 'b'])
+    {'c': 1}
+    >>> _doc_offset({'a': {}}, ['a', 'b'])
+    {}
+    """
+    for key in offset:
+        doc = doc.get(key) or {}
+    return doc
+
+
+def _bounds_shape(points: Optional[Dict]) -> Optional[BaseGeometry]:
+    """The four corner points as a polygon. Matches _bounds_polygon()"""
+    if not points:
+        return None
+    return Polygon(
+        [(points[key]["x"], points[key]["y"]) for key in ("ll", "ul", "ur", "lr", "ll")]
+    )
+
+
+def _dataset_size_bytes(dataset: Dataset) -> Optional[int]:
+    """Matches _size_bytes_field()"""
+    if "size_bytes" in dataset.metadata_type.dataset_fields:
+        return dataset.metadata.size_bytes
+    return dataset.metadata_doc.get("size_bytes")
+
+
+def _load_srid_lookup(engine: Engine) -> Dict[Tuple[str, int], int]:
+    """
+    Get all known srids, keyed by their (lowercase) authority name and code.
+
+    (It's a small table, so we fetch it in one query rather than a lookup per dataset)
+    """
+    return {
+        (auth_name.lower(), auth_srid): srid
+        for srid, auth_name, auth_srid in engine.execute(
+            select(
+                [
+                    SPATIAL_REF_SYS.c.srid,
+                    SPATIAL_REF_SYS.c.auth_name,
+                    SPATIAL_REF_SYS.c.auth_srid,
+                ]
+            )
+        )
+        if auth_name is not None
+    }
+
+
+# The same patterns get_dataset_srid_alchemy_expression() matches in Postgres.
+# (Postgres's "$" only matches at the very end, like Python's "\Z")
+_CRS_CODE_PATTERN = re.compile(r"^([A-Za-z0-9]+):([0-9]+)\Z")
+_WKT_AUTHORITY_PATTERN = re.compile(r'AUTHORITY\["([a-zA-Z0-9]+)", *"([0-9]+)"\]\]\Z')
+
+
+def _dataset_crs_authority(
+    spatial_ref: Optional[str], projection: Dict
+) -> Optional[Tuple[str, int]]:
+    """
+    Get the (lowercase) authority name and code of a dataset's crs, if it has one.
+
+    Matches get_dataset_srid_alchemy_expression(): we don't parse the crs itself, so
+    WKT without an authority clause has none.
+
+    >>> _dataset_crs_authority('EPSG:32755', {})
+    ('epsg', 32755)
+    >>> _dataset_crs_authority('PROJCS["UTM 55S",UNIT["metre",1],AUTHORITY["EPSG","32755"]]', {})
+    ('epsg', 32755)
+    >>> _dataset_crs_authority('PROJCS["UTM 55S",UNIT["metre",1]]', {}) is None
+    True
+    >>> _dataset_crs_authority(None, {'datum': 'GDA94', 'zone': -55})
+    ('epsg', 28355)
+    >>> _dataset_crs_authority(None, {}) is None
+    True
+    """
+    if isinstance(spatial_ref, str):
+        for pattern in (_CRS_CODE_PATTERN, _WKT_AUTHORITY_PATTERN):
+            match = pattern.search(spatial_ref)
+            if match:
+                auth_name, auth_code = match.groups()
+                return auth_name.lower(), int(auth_code)
+
+    # Some older datasets have datum/zone fields instead.
+    if projection.get("datum") == "GDA94":
+        return "epsg", int(f"283{abs(int(projection['zone']))}")
+    return None
+
+
+class _CopyRowsFile:
+    """
+    A minimal readable file of tab-separated rows, in Postgres's COPY text format.
+
+    (So we can stream rows to ``copy_expert()`` without buffering them all at once)
+    """
+
+    def __init__(self, rows: Iterable[Tuple]) -> None:
+        self._lines = (_as_copy_line(row) for row in rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+
+        if size < 0:
+            size = len(self._buffer)
+        out, self._buffer = self._buffer[:size], self._buffer[size:]
+        return out
+
+
+def _as_copy_line(row: Tuple) -> str:
+    r"""
+    >>> _as_copy_line((1, None, 'a\tb', datetime(2020, 1, 2)))
+    '1\t\\N\ta\\tb\t2020-01-02T00:00:00\n'
+    """
+    return "\t".join(_as_copy_value(v) for v in row) + "\n"
+
+
+def _as_copy_value(v) -> str:
+    if v is None:
+        return "\\N"
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return (
+        str(v)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+@contextmanager
+def _streaming_connection(engine: Engine) -> Generator[Connection, None, None]:
+    """
+    A connection whose results are streamed from a server-side cursor, rather
+    than all being fetched into memory first.
+
+    (Server-side cursors only exist within a transaction, but ODC's engine autocommits,
+    so we open one for the duration.)
+    """
+    with engine.connect() as conn:
+        conn = conn.execution_options(
+            isolation_level="READ COMMITTED", stream_results=True
+        )
+        with conn.begin():
+            yield conn
+
+
+@contextmanager
+def _extent_staging_table(engine: Engine) -> Generator[Tuple, None, None]:
+    """
+    Create a temporary table to stage dataset extents, dropping it afterwards.
+
+    Yields the connection that owns the table, and the table itself.
+    """
+    stage = table(
+        _STAGING_TABLE,
+        # Typed ids, so we can page through them using the returned values.
+        column("id", DATASET_SPATIAL.c.id.type),
+        *(column(c.name) for c in DATASET_SPATIAL.c if c.name != "id"),
+    )
+    # Temporary tables belong to their session, so everything must happen on one connection.
+    with engine.connect() as conn:
+        # Temporary tables also skip the write-ahead-log, unlike our real table.
+        conn.execute(
+            f"create temporary table if not exists {_STAGING_TABLE} "
+            f"(like {DATASET_SPATIAL.fullname} including defaults)"
+        )
+        # Our rows are derived from the ODC index, so a crash losing the last few
+        # commits is harmless: the next refresh re-adds them. Don't wait on disk flushes.
+        conn.execute("set synchronous_commit = off")
+        try:
+            yield conn, stage
+        finally:
+            # The connection is returned to a pool, so don't leave the table
+            # (or our settings) behind.
+            conn.execute(f"drop table if exists {_STAGING_TABLE}")
+            conn.execute("reset synchronous_commit")
+
+
+def _merge_staged_extents(conn, stage) -> int:
+    """
+    Insert all rows from the staging table into the spatial table
+
+    Returns the count of rows inserted.
+    """
+    names = [c.name for c in stage.c]
+    return conn.execute(
+        postgres.insert(DATASET_SPATIAL)
+        .from_select(
+            names,
+            select([stage.c[name] for name in names]).order_by(stage.c.center_time),
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+    ).rowcount
+
+
 def _select_dataset_extent_columns(dt: DatasetType) -> List[Label]:
     """
     Get columns for all fields which go into the spatial table
@@ -479,6 +1088,7 @@ def _select_dataset_extent_columns(dt: DatasetType) -> List[Label]:
     ]
 
 
+@functools.lru_cache()
 def center_time_expression(md_type: MetadataType):
     """
     The center time for the given metadata doc.
@@ -512,6 +1122,7 @@ def _default_crs(dt: DatasetType) -> Optional[str]:
     return storage.get("crs")
 
 
+@functools.lru_cache()
 def _dataset_creation_expression(md: MetadataType) -> ClauseElement:
     """SQLAlchemy expression for the creation (processing) time of a dataset"""
 
@@ -1,3 +1,4 @@
+import functools
 import warnings
 from collections import Counter
 from dataclasses import dataclass
@@ -252,14 +253,13 @@ class TimePeriodOverview:
     def _group_counter_if_needed(counter, period):
         if len(counter) > 366:
             if period == "day":
-                counter = Counter(
-                    datetime(date.year, date.month, 1).date()
-                    for date in counter.elements()
+                counter = _regroup_counter(
+                    counter, lambda date: datetime(date.year, date.month, 1).date()
                 )
                 period = "month"
             elif period == "month":
-                counter = Counter(
-                    datetime(date.year, 1, 1).date() for date in counter.elements()
+                counter = _regroup_counter(
+                    counter, lambda date: datetime(date.year, 1, 1).date()
                 )
                 period = "year"
 
@@ -269,12 +269,39 @@ class TimePeriodOverview:
     def footprint_srid(self):
         if self.footprint_crs is None:
             return None
-        epsg = self.footprint_crs.lower()
+        return _epsg_srid(self.footprint_crs)
 
-        if not epsg.startswith("epsg:"):
-            _LOG.warn("unsupported.to_srid", crs=self.footprint_crs)
-            return None
-        return int(epsg.split(":")[1])
+
+def _regroup_counter(counter: Counter, group_key) -> Counter:
+    """
+    Sum the counts of each key into their group.
+
+    (We add up the counts directly, rather than iterating over every element: a
+    period's counts can total millions of datasets.)
+    """
+    grouped = Counter()
+    for key, count in counter.items():
+        grouped[group_key(key)] += count
+    return grouped
+
+
+@functools.lru_cache()
+def _epsg_srid(crs: str) -> Optional[int]:
+    """
+    The srid of an 'epsg:' crs string.
+
+    (Cached, as it's read repeatedly on page loads, and we only see a handful of crses.
+    So an unsupported crs is only warned about the first time it's seen in a process.)
+
+    >>> _epsg_srid('EPSG:3577')
+    3577
+    """
+    epsg = crs.lower()
+
+    if not epsg.startswith("epsg:"):
+        _LOG.warn("unsupported.to_srid", crs=crs)
+        return None
+    return int(epsg.split(":")[1])
 
 
 def _has_shape(datasets: Tuple[Dataset, Tuple[BaseGeometry, bool]]) -> bool:
@@ -309,10 +336,17 @@ def _create_unified_footprint(
     if not with_valid_geometries:
         return None
 
+    # Union the individual polygons, each pre-simplified to within our final tolerance:
+    # it's far cheaper for GEOS than unioning many large, overlapping multipolygons.
+    polygons = _polygon_chain(with_valid_geometries)
+    if footprint_tolerance is not None:
+        polygons = [
+            p.simplify(footprint_tolerance / 2, preserve_topology=True)
+            for p in polygons
+        ]
+
     try:
-        geometry_union = shapely.ops.unary_union(
-            [p.footprint_geometry for p in with_valid_geometries]
-        )
+        geometry_union = shapely.ops.unary_union(polygons)
     except ValueError:
         # Attempt 2 at union: Exaggerate the overlap *slightly* to
         # avoid non-noded intersection.
@@ -341,7 +375,7 @@ def _polygon_chain(valid_geometries: Iterable[TimePeriodOverview]) -> list:
     polygonlist = []
     for poly in valid_geometries:
         if type(poly.footprint_geometry) is MultiPolygon:
-            for p in list(poly.footprint_geometry):
+            for p in poly.footprint_geometry.geoms:
                 polygonlist.append(p)
         else:
             polygonlist.append(poly.footprint_geometry)
@@ -3,7 +3,7 @@ from __future__ import absolute_import
 import warnings
 from enum import Enum
 from textwrap import dedent
-from typing import Set
+from typing import Iterable, Set
 
 import structlog
 from geoalchemy2 import Geometry
@@ -27,10 +27,11 @@ from sqlalchemy import (
     func,
     select,
     bindparam,
+    text,
 )
 from sqlalchemy.dialects import postgresql as postgres
 from sqlalchemy.engine import Engine
-from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.exc import DBAPIError, ProgrammingError
 
 from cubedash import _utils
 from cubedash._utils import ODC_DATASET
@@ -39,7 +40,6 @@ _LOG = structlog.get_logger()
 
 CUBEDASH_SCHEMA = "cubedash"
 METADATA = MetaData(schema=CUBEDASH_SCHEMA)
-GRIDCELL_COL_SPEC = f"{CUBEDASH_SCHEMA}.gridcell"
 
 # Albers equal area. Allows us to show coverage in m^2 easily.
 FOOTPRINT_SRID = 3577
@@ -82,13 +82,20 @@ DATASET_SPATIAL = Table(
     ),
 )
 
-DATASET_SPATIAL.indexes.add(
-    Index(
-        "dataset_spatial_footprint_wrs86_idx",
-        func.ST_Transform(DATASET_SPATIAL.c.footprint, 4326),
-        postgresql_using="gist",
-    )
+# Spatial searches are done in wgs84.
+_FOOTPRINT_WGS84_INDEX = Index(
+    "dataset_spatial_footprint_wgs84_idx",
+    func.ST_Transform(DATASET_SPATIAL.c.footprint, 4326),
+    postgresql_using="gist",
+    # Partial: non-spatial products' (many) datasets would only bloat it.
+    postgresql_where=DATASET_SPATIAL.c.footprint.isnot(None),
+    _table=DATASET_SPATIAL,
 )
+# The earlier, non-partial, version of the above.
+_OLD_FOOTPRINT_INDEX_NAME = "dataset_spatial_footprint_wrs86_idx"
+# Spatial searches within a product, such as a single collection's Stac items.
+# This is optional, as it needs the btree_gist extension: see _add_product_footprint_index()
+_PRODUCT_FOOTPRINT_INDEX_NAME = "dataset_spatial_product_footprint_wgs84_idx"
 # An index matching the default Stac API Item search and its sort order.
 _COLLECTION_ITEMS_INDEX = Index(
     "dataset_spatial_collection_items_idx",
@@ -108,9 +115,28 @@ _ALL_COLLECTIONS_ORDER_INDEX = Index(
     postgresql_where=DATASET_SPATIAL.c.footprint.isnot(None),
     _table=DATASET_SPATIAL,
 )
+# Product-independent time range scans.
+# Datasets are mostly added in time order, so tiny BRIN indexes are enough.
+_CENTER_TIME_BRIN_INDEX = Index(
+    "dataset_spatial_center_time_brin_idx",
+    "center_time",
+    postgresql_using="brin",
+    postgresql_with={"pages_per_range": 32},
+    _table=DATASET_SPATIAL,
+)
+_CREATION_TIME_BRIN_INDEX = Index(
+    "dataset_spatial_creation_time_brin_idx",
+    "creation_time",
+    postgresql_using="brin",
+    postgresql_with={"pages_per_range": 32},
+    _table=DATASET_SPATIAL,
+)
 
+DATASET_SPATIAL.indexes.add(_FOOTPRINT_WGS84_INDEX)
 DATASET_SPATIAL.indexes.add(_COLLECTION_ITEMS_INDEX)
 DATASET_SPATIAL.indexes.add(_ALL_COLLECTIONS_ORDER_INDEX)
+DATASET_SPATIAL.indexes.add(_CENTER_TIME_BRIN_INDEX)
+DATASET_SPATIAL.indexes.add(_CREATION_TIME_BRIN_INDEX)
 
 # Note that we deliberately don't foreign-key to datacube tables:
 # - We don't want to add an external dependency on datacube core
@@ -305,6 +331,22 @@ def update_schema(engine: Engine) -> Set[PleaseRefresh]:
 
     refresh = set()
 
+    # Check for all our indexes at once.
+    existing = pg_existing(
+        engine,
+        (
+            f"{CUBEDASH_SCHEMA}.{name}"
+            for name in (
+                _COLLECTION_ITEMS_INDEX.name,
+                _ALL_COLLECTIONS_ORDER_INDEX.name,
+                _FOOTPRINT_WGS84_INDEX.name,
+                _PRODUCT_FOOTPRINT_INDEX_NAME,
+                _CENTER_TIME_BRIN_INDEX.name,
+                _CREATION_TIME_BRIN_INDEX.name,
+            )
+        ),
+    )
+
     if not pg_column_exists(engine, f"{CUBEDASH_SCHEMA}.product", "fixed_metadata"):
         _LOG.warn("schema.applying_update.add_fixed_metadata")
         engine.execute(
@@ -314,20 +356,26 @@ def update_schema(engine: Engine) -> Set[PleaseRefresh]:
         )
         refresh.add(PleaseRefresh.DATASET_EXTENTS)
 
-    if not pg_exists(
-        engine,
-        f"{CUBEDASH_SCHEMA}.{_COLLECTION_ITEMS_INDEX.name}",
-    ):
+    if f"{CUBEDASH_SCHEMA}.{_COLLECTION_ITEMS_INDEX.name}" not in existing:
         _LOG.warn("schema.applying_update.add_collection_items_idx")
         _COLLECTION_ITEMS_INDEX.create(engine)
 
-    if not pg_exists(
-        engine,
-        f"{CUBEDASH_SCHEMA}.{_ALL_COLLECTIONS_ORDER_INDEX.name}",
-    ):
+    if f"{CUBEDASH_SCHEMA}.{_ALL_COLLECTIONS_ORDER_INDEX.name}" not in existing:
         _LOG.warn("schema.applying_update.add_all_collections_idx")
         _ALL_COLLECTIONS_ORDER_INDEX.create(engine)
 
+    if f"{CUBEDASH_SCHEMA}.{_FOOTPRINT_WGS84_INDEX.name}" not in existing:
+        _LOG.warn("schema.applying_update.add_partial_footprint_idx")
+        _FOOTPRINT_WGS84_INDEX.create(engine)
+        engine.execute(
+            f"drop index if exists {CUBEDASH_SCHEMA}.{_OLD_FOOTPRINT_INDEX_NAME}"
+        )
+
+    for brin_index in (_CENTER_TIME_BRIN_INDEX, _CREATION_TIME_BRIN_INDEX):
+        if f"{CUBEDASH_SCHEMA}.{brin_index.name}" not in existing:
+            _LOG.warn("schema.applying_update.add_time_brin_idx", name=brin_index.name)
+            brin_index.create(engine)
+
     if not pg_column_exists(
         engine, f"{CUBEDASH_SCHEMA}.time_overview", "product_refresh_time"
     ):
@@ -350,11 +398,60 @@ def update_schema(engine: Engine) -> Set[PleaseRefresh]:
         """
         )
 
+    if f"{CUBEDASH_SCHEMA}.{_PRODUCT_FOOTPRINT_INDEX_NAME}" not in existing:
+        _add_product_footprint_index(engine)
+
     check_or_update_odc_schema(engine)
 
     return refresh
 
 
+def _add_product_footprint_index(engine: Engine):
+    """
+    Add a combined product and footprint index, if we have permission.
+
+    Including the (integer) product id in a gist index needs the btree_gist extension.
+    It's only an optimisation, so if we can't install it we warn the user how to.
+    """
+    statements = []
+    if (
+        engine.execute(
+            "select count(*) from pg_extension where extname='btree_gist';"
+        ).scalar()
+        == 0
+    ):
+        statements.append("create extension btree_gist;")
+    statements.append(
+        f"create index {_PRODUCT_FOOTPRINT_INDEX_NAME} on {DATASET_SPATIAL.fullname} "
+        f"using gist (dataset_type_ref, ST_Transform(footprint, 4326)) "
+        f"where footprint is not null;"
+    )
+
+    _LOG.warn("schema.applying_update.add_product_footprint_idx")
+    try:
+        while statements:
+            engine.execute(statements[0])
+            statements.pop(0)
+    except DBAPIError:
+        # Lacking permission is a ProgrammingError, but a server without the contrib
+        # extensions installed gives an OperationalError: we treat both the same.
+        unexecuted_sql = "\n                ".join(statements)
+        warnings.warn(
+            dedent(
+                f"""
+            No product footprint index.
+            Explorer recommends a combined product and footprint index for spatial
+            searches, but could not add it to the current database. (It needs the
+            btree_gist extension, and permission to install it.)
+
+            It's recommended to add it manually in Postgres:
+
+                {unexecuted_sql}
+        """
+            )
+        )
+
+
 def check_or_update_odc_schema(engine: Engine):
     """
     Check that the ODC schema is updated enough to run Explorer,
@@ -431,6 +528,24 @@ def pg_exists(conn, name: str) -> bool:
     return conn.execute("select to_regclass(%s)", name).scalar() is not None
 
 
+def pg_existing(conn, names: Iterable[str]) -> Set[str]:
+    """
+    Which of the given postgres objects exist?
+
+    (Checked in one query, rather than a pg_exists() call for each)
+    """
+    return {
+        name
+        for [name] in conn.execute(
+            text(
+                "select name from unnest(cast(:names as text[])) as name "
+                "where to_regclass(name) is not null"
+            ),
+            names=list(names),
+        )
+    }
+
+
 def pg_index_exists(conn, schema_name: str, table_name: str, index_name: str) -> bool:
     """
     Does a postgres index exist?
@@ -493,47 +608,58 @@ def create_schema(engine: Engine):
     #
     # Doing it separately allows users to run this tool without `create` permission.
     #
-    if not engine.dialect.has_schema(engine, CUBEDASH_SCHEMA):
+    # (The same applies to Postgis below. We check for both in one query.)
+    has_cubedash_schema, has_postgis = engine.execute(
+        """
+        select
+            exists(select 1 from pg_namespace where nspname = %s),
+            exists(select 1 from pg_extension where extname = 'postgis')
+        """,
+        CUBEDASH_SCHEMA,
+    ).fetchone()
+    if not has_cubedash_schema:
         engine.execute(DDL(f"create schema {CUBEDASH_SCHEMA}"))
 
     # Add Postgis if needed
     #
     # Note that, as above, we deliberately don't use the built-in "if not exists"
     #
-    if (
-        engine.execute(
-            "select count(*) from pg_extension where extname='postgis';"
-        ).scalar()
-        == 0
-    ):
+    if not has_postgis:
         engine.execute(DDL("create extension postgis"))
 
     # We want an index on the spatial_ref_sys table to do authority name/code lookups.
     # But in RDS environments we cannot add indexes to it.
     # So we create our own copy as a materialised view (it's a very small table).
+    #
+    # (These statements are all idempotent, so they're sent together in one round-trip.)
     engine.execute(
         f"""
     create materialized view if not exists {CUBEDASH_SCHEMA}.mv_spatial_ref_sys
         as select * from spatial_ref_sys;
-    """
-    )
-    # The normal primary key.
-    engine.execute(
-        f"""
-        create unique index if not exists mv_spatial_ref_sys_srid_idx on
-            {CUBEDASH_SCHEMA}.mv_spatial_ref_sys(srid);
-        """
-    )
-    # For case insensitive auth name/code lookups.
-    # (Postgis doesn't add one by default, but we're going to do a lot of lookups)
-    engine.execute(
-        f"""
-        create unique index if not exists mv_spatial_ref_sys_lower_auth_srid_idx on
-            {CUBEDASH_SCHEMA}.mv_spatial_ref_sys(lower(auth_name::text), auth_srid);
+
+    -- The normal primary key.
+    create unique index if not exists mv_spatial_ref_sys_srid_idx on
+        {CUBEDASH_SCHEMA}.mv_spatial_ref_sys(srid);
+
+    -- For case insensitive auth name/code lookups.
+    -- (Postgis doesn't add one by default, but we're going to do a lot of lookups)
+    create unique index if not exists mv_spatial_ref_sys_lower_auth_srid_idx on
+        {CUBEDASH_SCHEMA}.mv_spatial_ref_sys(lower(auth_name::text), auth_srid);
     """
     )
 
-    METADATA.create_all(engine, checkfirst=True)
+    # Check for all of our tables in one query, rather than create_all()'s
+    # "checkfirst" query per table.
+    #
+    # (The optional product footprint index is added by update_schema(), which
+    # runs after this for new and existing schemas alike.)
+    existing = pg_existing(engine, [table.fullname for table in METADATA.sorted_tables])
+    missing_tables = [
+        table for table in METADATA.sorted_tables if table.fullname not in existing
+    ]
+    if missing_tables:
+        # (Still "checkfirst": our enum types may exist already.)
+        METADATA.create_all(engine, tables=missing_tables, checkfirst=True)
 
     # Useful reporting.
     engine.execute(
@@ -551,11 +677,7 @@ def create_schema(engine: Engine):
         from {CUBEDASH_SCHEMA}.dataset_spatial
         group by dataset_type_ref
     ) with no data;
-    """
-    )
 
-    engine.execute(
-        f"""
     create unique index if not exists mv_dataset_spatial_quality_dataset_type_ref
         on {CUBEDASH_SCHEMA}.mv_dataset_spatial_quality(dataset_type_ref);
     """
@@ -1,6 +1,5 @@
 import math
 import os
-import re
 from collections import Counter, defaultdict
 from copy import copy
 from dataclasses import dataclass
@@ -25,9 +24,9 @@ import dateutil.parser
 import structlog
 from cachetools.func import ttl_cache
 from dateutil import tz
-from geoalchemy2 import WKBElement
 from geoalchemy2 import shape as geo_shape
 from geoalchemy2.shape import to_shape
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy import DDL, String, and_, exists, func, literal, or_, select, union_all
 from sqlalchemy.dialects import postgresql as postgres
 from sqlalchemy.dialects.postgresql import TSTZRANGE
@@ -414,11 +413,18 @@ class SummaryStore:
         scan_for_deleted: bool = False,
         only_those_newer_than: datetime = None,
         force: bool = False,
+        compute_in_python: bool = False,
+        workers: int = 1,
     ) -> Tuple[int, ProductSummary]:
         """
         Update Explorer's computed extents for the given product, and record any new
         datasets into the spatial table.
 
+        :param compute_in_python: Compute new dataset extents here, rather than
+                                  in Postgres. (see refresh_spatial_extents())
+        :param workers: How many connections to recreate all dataset extents with, when
+                        computing them in Postgres. (see refresh_spatial_extents())
+
         Returns the count of changed dataset extents, and the
         updated product summary.
         """
@@ -435,6 +441,8 @@ class SummaryStore:
             product,
             clean_up_deleted=scan_for_deleted,
             assume_after_date=only_those_newer_than,
+            compute_in_python=compute_in_python,
+            workers=workers,
         )
 
         existing_summary = self.get_product_summary(product_name)
@@ -1145,7 +1153,6 @@ class SummaryStore:
 
         columns = [
             geom.label("geometry"),
-            func.Box2D(geom).cast(String).label("bbox"),
             # TODO: dataset label?
             DATASET_SPATIAL.c.region_code.label("region_code"),
             DATASET_SPATIAL.c.creation_time,
@@ -1199,11 +1206,13 @@ class SummaryStore:
         )
 
         for r in self._engine.execute(query):
+            # Parsed once, for both the bbox and the geometry.
+            footprint = None if r.geometry is None else to_shape(r.geometry)
             yield DatasetItem(
                 dataset_id=r.id,
-                bbox=_box2d_to_bbox(r.bbox) if r.bbox else None,
+                bbox=_shape_bbox(footprint),
                 product_name=self.index.products.get(r.dataset_type_ref).name,
-                geometry=_get_shape(r.geometry, self._get_srid_name(r.geometry.srid)),
+                geometry=_get_shape(footprint, self._get_srid_name(r.geometry.srid)),
                 region_code=r.region_code,
                 creation_time=r.creation_time,
                 center_time=r.center_time,
@@ -1264,6 +1273,8 @@ class SummaryStore:
         recreate_dataset_extents: bool = False,
         reset_incremental_position: bool = False,
         minimum_change_scan_window: timedelta = None,
+        compute_extents_in_python: bool = False,
+        extent_workers: int = 1,
     ) -> Tuple[GenerateResult, TimePeriodOverview]:
         """
         Update Explorer's information and summaries for a product.
@@ -1287,6 +1298,10 @@ class SummaryStore:
 
                        This is primarily useful for developers who restore from backups, whose Explorer
                        tables will be out of sync with a restored, newer ODC database.
+        :param compute_extents_in_python: Compute new dataset extents in Python rather than in
+                       Postgres, moving that load from the database server to this machine.
+        :param extent_workers: When recreating all of the product's dataset extents in Postgres,
+                       split the work across this many concurrent connections.
         """
         log = _LOG.bind(product_name=product_name)
 
@@ -1333,6 +1348,8 @@ class SummaryStore:
             only_those_newer_than=(
                 None if recreate_dataset_extents else only_datasets_newer_than
             ),
+            compute_in_python=compute_extents_in_python,
+            workers=extent_workers,
         )
         log.info("extent.refresh.done", changed=extent_changes)
 
@@ -1664,7 +1681,7 @@ def _summary_to_row(summary: TimePeriodOverview) -> dict:
         dataset_count=summary.dataset_count,
         timeline_dataset_start_days=day_values,
         timeline_dataset_counts=day_counts,
-        # TODO: SQLAlchemy needs a bit of type help for some reason. Possible PgGridCell bug?
+        # TODO: SQLAlchemy needs a bit of type help for some reason.
         regions=func.cast(region_values, type_=postgres.ARRAY(String)),
         region_dataset_counts=region_counts,
         timeline_period=summary.timeline_period,
@@ -1751,35 +1768,27 @@ def _dataset_to_feature(dataset: Dataset):
     }
 
 
-_BOX2D_PATTERN = re.compile(
-    r"BOX\(([-0-9.e]+)\s+([-0-9.e]+)\s*,\s*([-0-9.e]+)\s+([-0-9.e]+)\)"
-)
+def _shape_bbox(
+    shape: Optional[BaseGeometry],
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Get the geojson/stac bbox tuple of a (wgs84) shape.
 
+    (We take it from the geometry we've already fetched, rather than also fetching
+    Postgis's box2d, which needs another transform of the footprint and a text parse.)
 
-def _box2d_to_bbox(pg_box2d: str) -> Tuple[float, float, float, float]:
+    >>> from shapely.geometry import box
+    >>> _shape_bbox(box(134.8, -17.8, 135.8, -16.8))
+    (134.8, -17.8, 135.8, -16.8)
+    >>> _shape_bbox(None) is None
+    True
     """
-    Parse Postgis's box2d to a geojson/stac bbox tuple.
-
-    >>> _box2d_to_bbox(
-    ...     "BOX(134.806923200497 -17.7694714883835,135.769692610214 -16.8412669214876)"
-    ... )
-    (134.806923200497, -17.7694714883835, 135.769692610214, -16.8412669214876)
-    >>> # Scientific notation in numbers is sometimes given
-    >>> _box2d_to_bbox(
-    ...     "BOX(35.6948526641442 -0.992278901187827,36.3518945675102 -9.03173177994956e-06)"
-    ... )
-    (35.6948526641442, -0.992278901187827, 36.3518945675102, -9.03173177994956e-06)
-    """
-    m = _BOX2D_PATTERN.match(pg_box2d)
-    if m is None:
-        raise RuntimeError(f"Unexpected postgis box syntax {pg_box2d!r}")
-
-    # We know there's exactly four groups, but type checker doesn't...
-    # noinspection PyTypeChecker
-    return tuple(float(m) for m in m.groups())
+    if shape is None or shape.is_empty:
+        return None
+    return shape.bounds
 
 
-def _get_shape(geometry: WKBElement, crs) -> Optional[Geometry]:
+def _get_shape(shape: Optional[BaseGeometry], crs) -> Optional[Geometry]:
     """
     Our shapes are valid in the db, but can become invalid on
     reprojection. We buffer if needed.
@@ -1788,10 +1797,10 @@ def _get_shape(geometry: WKBElement, crs) -> Optional[Geometry]:
 
     (the tests reproduce this error.... but it may be machine/environment dependent?)
     """
-    if geometry is None:
+    if shape is None:
         return None
 
-    shape = Geometry(to_shape(geometry), crs).to_crs("EPSG:4326", wrapdateline=True)
+    shape = Geometry(shape, crs).to_crs("EPSG:4326", wrapdateline=True)
 
     if not shape.is_valid:
         newshape = shape.buffer(0)
@@ -142,26 +142,24 @@ class Summariser:
         region_counts = Counter()
         if has_data:
             day_counts.update(
-                Counter(
-                    {
-                        day.date(): count
-                        for day, count in self._engine.execute(
-                            select(
-                                [
-                                    func.date_trunc(
-                                        "day",
-                                        DATASET_SPATIAL.c.center_time.op(
-                                            "AT TIME ZONE"
-                                        )(self.grouping_time_zone),
-                                    ).label("day"),
-                                    func.count(),
-                                ]
-                            )
-                            .where(where_clause)
-                            .group_by("day")
+                {
+                    day.date(): count
+                    for day, count in self._engine.execute(
+                        select(
+                            [
+                                func.date_trunc(
+                                    "day",
+                                    DATASET_SPATIAL.c.center_time.op("AT TIME ZONE")(
+                                        self.grouping_time_zone
+                                    ),
+                                ).label("day"),
+                                func.count(),
+                            ]
                         )
-                    }
-                )
+                        .where(where_clause)
+                        .group_by("day")
+                    )
+                }
             )
             region_counts = Counter(
                 {
@@ -3,7 +3,7 @@ Tests related to the store
 """
 
 from collections import Counter
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from shapely.geometry import shape
 from shapely.geometry.base import BaseGeometry
@@ -251,3 +251,21 @@ def test_computed_properties():
 
     o.dataset_count = 321
     assert str(o) == "test_product 2018 4 6 (321 datasets)"
+
+
+def test_large_timelines_are_grouped():
+    days = Counter(
+        {date(2018, 1, 1) + timedelta(days=i): 1_000_000 + i for i in range(400)}
+    )
+    months, period = TimePeriodOverview._group_counter_if_needed(days, "day")
+    assert period == "month"
+    assert sum(months.values()) == sum(days.values())
+    assert months[date(2018, 2, 1)] == sum(
+        c for d, c in days.items() if (d.year, d.month) == (2018, 2)
+    )
+
+    # Small timelines are left alone.
+    assert TimePeriodOverview._group_counter_if_needed(months, "month") == (
+        months,
+        "month",
+    )
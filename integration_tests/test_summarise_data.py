@@ -3,24 +3,32 @@ Load a lot of real-world DEA datasets (very slow)
 
 And then check their statistics match expected.
 """
+import operator
+from copy import deepcopy
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
+from typing import Dict, Tuple
 from uuid import UUID
 
 import pytest
 from dateutil import tz
 from dateutil.tz import tzutc
+from geoalchemy2 import WKBElement
+from geoalchemy2.shape import to_shape
+from pyproj import CRS as PJCRS
+from sqlalchemy import select
 
 from cubedash import _utils
-from cubedash._utils import alchemy_engine
-from cubedash.summary import SummaryStore
+from cubedash._utils import alchemy_engine, ODC_DATASET
+from cubedash.summary import SummaryStore, _extents
 from cubedash.summary._extents import GridRegionInfo
-from cubedash.summary._schema import CUBEDASH_SCHEMA
+from cubedash.summary._schema import CUBEDASH_SCHEMA, DATASET_SPATIAL, get_srid_name
 from datacube.index import Index
 from datacube.index.hl import Doc2Dataset
 from datacube.model import Range, DatasetType
 from datacube.utils import read_documents
-from .asserts import expect_values as _expect_values
+from .asserts import assert_shapes_mostly_equal, expect_values as _expect_values
 
 TEST_DATA_DIR = Path(__file__).parent / "data"
 
@@ -562,3 +570,231 @@ def test_computed_regions_match_those_summarised(summary_store: SummaryStore):
                 f"{python_calculated_region_code!r} != {alchemy_calculated_region_code!r}"
                 f"for product {dataset.type.name!r}, dataset {dataset!r}"
             )
+
+
+def test_python_computed_extents_match_those_in_db(summary_store: SummaryStore):
+    """
+    Dataset extents computed in Python should match those computed by Postgres.
+    """
+    summary_store.refresh_all_product_extents()
+    engine = alchemy_engine(summary_store.index)
+    srids = _extents._load_srid_lookup(engine)
+
+    for product in summary_store.index.products.get_all():
+        for (
+            dataset_id,
+            _,
+            center_time,
+            footprint,
+            region_code,
+            size_bytes,
+            creation_time,
+        ) in _extents.iter_dataset_extent_rows(summary_store.index, product, srids):
+            row = engine.execute(
+                select([DATASET_SPATIAL]).where(DATASET_SPATIAL.c.id == dataset_id)
+            ).fetchone()
+            assert row is not None, f"Dataset {dataset_id} is missing from the db"
+            assert row.center_time == center_time
+            assert row.creation_time == creation_time
+            assert row.region_code == region_code
+            assert row.size_bytes == size_bytes
+
+            if row.footprint is None:
+                assert footprint is None
+            else:
+                footprint = WKBElement(footprint, extended=True)
+                assert footprint.srid == row.footprint.srid
+                _assert_footprints_match(engine, footprint, row.footprint)
+
+
+def test_python_computed_extents_use_product_crs(summary_store: SummaryStore):
+    """
+    A dataset without its own crs should fall back to the product's storage crs,
+    as it does in Postgres.
+    """
+    index = summary_store.index
+    srids = _extents._load_srid_lookup(alchemy_engine(index))
+
+    product = index.products.get_by_name("ls8_nbar_albers")
+    assert _extents._default_crs(product) == "EPSG:3577"
+
+    [(_, doc)] = islice(
+        read_documents(TEST_DATA_DIR / "ls8-nbar-albers-sample.yaml.gz"), 1
+    )
+    original = index.datasets.get(doc["id"])
+    assert original.crs is not None
+
+    # An in-memory copy of it, without a crs. (It's not added to the index)
+    doc = deepcopy(doc)
+    del doc["grid_spatial"]["projection"]["spatial_reference"]
+    crs_less, err = Doc2Dataset(index)(doc, "file://example.com/test_dataset/no-crs")
+    assert crs_less is not None, err
+
+    [original_row, crs_less_row] = _extents.iter_dataset_extent_rows(
+        index, product, srids, datasets=[original, crs_less]
+    )
+    # The footprint is at index 3.
+    assert crs_less_row[3] is not None, "No footprint without a dataset crs"
+    assert crs_less_row[3] == original_row[3]
+
+
+def test_python_computed_extent_recreation(summary_store: SummaryStore):
+    """
+    Recreating extents in Python should give the same rows as Postgres.
+    """
+    summary_store.refresh_all_product_extents()
+    engine = alchemy_engine(summary_store.index)
+
+    for product in summary_store.index.products.get_all():
+        expected_rows = _spatial_rows(engine, product)
+        engine.execute(
+            DATASET_SPATIAL.delete().where(
+                DATASET_SPATIAL.c.dataset_type_ref == product.id
+            )
+        )
+        change_count, _ = summary_store.refresh_product_extent(
+            product.name, compute_in_python=True
+        )
+        assert change_count == len(expected_rows)
+        _assert_rows_match(engine, _spatial_rows(engine, product), expected_rows)
+
+
+def test_python_computed_incremental_extents(summary_store: SummaryStore):
+    """
+    An incremental refresh in Python should re-add (only) the missing rows.
+    """
+    summary_store.refresh_all_product_extents()
+    engine = alchemy_engine(summary_store.index)
+
+    for product in summary_store.index.products.get_all():
+        expected_rows = _spatial_rows(engine, product)
+        removed_ids = list(islice(expected_rows, 3))
+        if not removed_ids:
+            continue
+        engine.execute(
+            DATASET_SPATIAL.delete().where(DATASET_SPATIAL.c.id.in_(removed_ids))
+        )
+
+        # Every dataset was indexed after this, so all are scanned: the existing
+        # ones are updated, and only the missing ones should be inserted.
+        change_count, _ = summary_store.refresh_product_extent(
+            product.name,
+            compute_in_python=True,
+            only_those_newer_than=datetime(2000, 1, 1, tzinfo=tzutc()),
+        )
+        assert change_count == len(expected_rows)
+        _assert_rows_match(engine, _spatial_rows(engine, product), expected_rows)
+
+        # ... and the insert alone should add exactly those missing.
+        engine.execute(
+            DATASET_SPATIAL.delete().where(DATASET_SPATIAL.c.id.in_(removed_ids))
+        )
+        product_datasets = [ODC_DATASET.c.dataset_type_ref == product.id]
+        inserted = _extents._insert_new_extents_from_python(
+            summary_store.index, product, product_datasets
+        )
+        assert inserted == len(removed_ids)
+        assert (
+            _extents._insert_new_extents_from_python(
+                summary_store.index, product, product_datasets
+            )
+            == 0
+        ), "Existing rows were inserted again"
+        _assert_rows_match(engine, _spatial_rows(engine, product), expected_rows)
+
+
+def test_python_computed_extents_of_non_spatial_product(summary_store: SummaryStore):
+    """
+    Non-spatial products have no dataset footprints to compute, as in Postgres,
+    but their datasets should still be added.
+    """
+    index = summary_store.index
+    product = index.products.get_by_name("ls8_satellite_telemetry_data")
+    assert not _extents._is_spatial(product.metadata_type)
+
+    summary_store.refresh_all_product_extents()
+    engine = alchemy_engine(index)
+    expected_rows = _spatial_rows(engine, product)
+    assert expected_rows, "Expected the product to have datasets"
+
+    rows = list(
+        _extents.iter_dataset_extent_rows(
+            index, product, _extents._load_srid_lookup(engine)
+        )
+    )
+    assert len(rows) == len(expected_rows)
+    # The footprint is at index 3.
+    assert all(row[3] is None for row in rows)
+
+    engine.execute(
+        DATASET_SPATIAL.delete().where(DATASET_SPATIAL.c.dataset_type_ref == product.id)
+    )
+    change_count, _ = summary_store.refresh_product_extent(
+        product.name, compute_in_python=True
+    )
+    assert change_count == len(expected_rows)
+    # (Their footprints come from their WRS path/rows, after the insert.)
+    _assert_rows_match(engine, _spatial_rows(engine, product), expected_rows)
+
+
+def _spatial_rows(engine, product: DatasetType) -> Dict[UUID, Tuple]:
+    return {
+        row.id: row
+        for row in engine.execute(
+            select([DATASET_SPATIAL]).where(
+                DATASET_SPATIAL.c.dataset_type_ref == product.id
+            )
+        )
+    }
+
+
+def _assert_rows_match(engine, rows: Dict[UUID, Tuple], expected_rows: Dict):
+    __tracebackhide__ = operator.methodcaller("errisinstance", AssertionError)
+    assert rows.keys() == expected_rows.keys()
+    for dataset_id, row in rows.items():
+        expected = expected_rows[dataset_id]
+        for column in ("center_time", "creation_time", "region_code", "size_bytes"):
+            assert row[column] == expected[column], f"{column} of {dataset_id}"
+        if expected.footprint is None:
+            assert row.footprint is None
+        else:
+            assert row.footprint.srid == expected.footprint.srid
+            _assert_footprints_match(engine, row.footprint, expected.footprint)
+
+
+def _assert_footprints_match(engine, footprint: WKBElement, expected: WKBElement):
+    __tracebackhide__ = operator.methodcaller("errisinstance", AssertionError)
+    # Footprints are in their native CRS, so the threshold must be in its units.
+    crs = PJCRS.from_user_input(get_srid_name(engine, expected.srid))
+    # (Roughly a metre)
+    threshold = 1e-5 if crs.is_geographic else 1.0
+    assert_shapes_mostly_equal(to_shape(footprint), to_shape(expected), threshold)
+
+
+@pytest.mark.parametrize(
+    "workers",
+    [
+        3,
+        # More than the engine's pool can hold at once: should be limited to what it can.
+        256,
+    ],
+)
+def test_sharded_extent_recreation(summary_store: SummaryStore, workers: int):
+    """
+    Recreating extents with several workers should still add every dataset, once.
+    """
+    summary_store.refresh_all_product_extents()
+    engine = alchemy_engine(summary_store.index)
+
+    for product in summary_store.index.products.get_all():
+        expected_rows = _spatial_rows(engine, product)
+        engine.execute(
+            DATASET_SPATIAL.delete().where(
+                DATASET_SPATIAL.c.dataset_type_ref == product.id
+            )
+        )
+        change_count, _ = summary_store.refresh_product_extent(
+            product.name, workers=workers
+        )
+        assert change_count == len(expected_rows)
+        _assert_rows_match(engine, _spatial_rows(engine, product), expected_rows)